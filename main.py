@@ -57,7 +57,10 @@ def resolve_task_from_asr(args: argparse.Namespace) -> str | None:
             api_key=args.asr_api_key,
             websocket_url=args.asr_websocket_url,
             block_size=args.asr_block_size,
+            send_batch_blocks=args.asr_send_batch_blocks,
+            frames_per_buffer=args.asr_frames_per_buffer,
             semantic_punctuation_enabled=args.asr_semantic_punctuation,
+            raise_sender_priority=args.asr_raise_priority,
         )
     )
 
@@ -590,7 +593,33 @@ Examples:
         "--asr-block-size",
         type=int,
         default=int(os.getenv("PHONE_AGENT_ASR_BLOCK_SIZE", "3200")),
-        help="Audio frames per buffer for realtime ASR (default: 3200)",
+        help="Audio frames per ASR send block (default: 3200)",
+    )
+
+    parser.add_argument(
+        "--asr-frames-per-buffer",
+        type=int,
+        default=(
+            int(os.environ["PHONE_AGENT_ASR_FRAMES_PER_BUFFER"])
+            if os.getenv("PHONE_AGENT_ASR_FRAMES_PER_BUFFER")
+            else None
+        ),
+        help="PortAudio frames per buffer (default: chosen from the host audio API)",
+    )
+
+    parser.add_argument(
+        "--asr-send-batch-blocks",
+        type=int,
+        default=int(os.getenv("PHONE_AGENT_ASR_SEND_BATCH_BLOCKS", "4")),
+        help="Audio blocks coalesced into one ASR websocket send (default: 4)",
+    )
+
+    parser.add_argument(
+        "--asr-raise-priority",
+        action="store_true",
+        default=os.getenv("PHONE_AGENT_ASR_RAISE_PRIORITY", "").lower()
+        in ("1", "true", "yes"),
+        help="Raise the ASR audio sender thread's scheduling priority (Linux/Windows)",
     )
 
     parser.add_argument(
@@ -3,8 +3,13 @@
 # Added realtime ASR task input support (DashScope + microphone).
 """Realtime speech recognition client based on DashScope ASR."""
 
+import atexit
+import os
+import queue
 import signal
-import time
+import sys
+import threading
+from collections import deque
 from dataclasses import dataclass
 
 
@@ -17,11 +22,92 @@ class RealtimeASRConfig:
     sample_rate: int = 16000
     channels: int = 1
     block_size: int = 3200
+    send_batch_blocks: int = 4
+    drain_threshold: int = 5
+    max_coalesce_ms: int = 1000
+    frames_per_buffer: int | None = None
+    # Host API name used only to pick the default frames_per_buffer; it does not
+    # select which host API PortAudio opens. None means query the default one.
+    host_api_name: str | None = None
+    pa_min_latency_msec: int | None = None
+    raise_sender_priority: bool = False
+    max_sentences: int = 1024
     semantic_punctuation_enabled: bool = False
     api_key: str | None = None
     websocket_url: str | None = "wss://dashscope.aliyuncs.com/api-ws/v1/inference"
 
 
+_PA_INSTANCE = None
+_PA_LOCK = threading.Lock()
+
+
+def _get_pyaudio():
+    """Return the process-wide PyAudio instance, creating it on first use.
+
+    PortAudio initialization enumerates devices and is slow, so the instance is
+    kept for the life of the process and only streams are opened per call.
+    """
+    global _PA_INSTANCE
+    with _PA_LOCK:
+        if _PA_INSTANCE is None:
+            import pyaudio
+
+            _PA_INSTANCE = pyaudio.PyAudio()
+            atexit.register(_terminate_pyaudio)
+        return _PA_INSTANCE
+
+
+def _terminate_pyaudio() -> None:
+    global _PA_INSTANCE
+    with _PA_LOCK:
+        if _PA_INSTANCE is not None:
+            try:
+                _PA_INSTANCE.terminate()
+            except Exception:
+                pass
+            _PA_INSTANCE = None
+
+
+def _default_frames_per_buffer(host_api_name: str) -> int:
+    """Pick a PortAudio buffer size suited to the host audio API."""
+    name = host_api_name.lower()
+    if "wasapi" in name or "core audio" in name or "coreaudio" in name:
+        return 512
+    if "alsa" in name:
+        return 1024
+    return 2048
+
+
+def _raise_thread_priority() -> None:
+    """Best-effort bump of the calling thread's scheduling priority."""
+    if sys.platform == "win32":
+        try:
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            thread_priority_time_critical = 15
+            kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(), thread_priority_time_critical
+            )
+        except Exception:
+            pass
+        return
+
+    # Elsewhere (e.g. macOS) these calls would reprioritize the whole process.
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        # On Linux pid 0 targets the calling thread only.
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        return
+    except OSError:
+        pass
+    try:
+        os.nice(-5)
+    except OSError:
+        pass
+
+
 class RealtimeASRClient:
     """Realtime microphone ASR wrapper."""
 
@@ -30,6 +116,12 @@ class RealtimeASRClient:
 
     def transcribe_once(self) -> str:
         """Start realtime recognition and stop by Ctrl+C."""
+        if self.config.pa_min_latency_msec is not None:
+            # Read when PortAudio initializes; with the shared PyAudio instance
+            # only the value in effect on the first call is used.
+            os.environ.setdefault(
+                "PA_MIN_LATENCY_MSEC", str(self.config.pa_min_latency_msec)
+            )
         try:
             import dashscope
             import pyaudio
@@ -48,34 +140,51 @@ class RealtimeASRClient:
         if self.config.websocket_url:
             dashscope.base_websocket_api_url = self.config.websocket_url
 
+        audio_queue: queue.SimpleQueue[bytes] = queue.SimpleQueue()
+
         state: dict[str, object] = {
-            "mic": None,
             "stream": None,
-            "sentences": [],
+            "sentences": deque(maxlen=self.config.max_sentences),
             "last_text": "",
             "request_id": "",
             "error": None,
-            "stopping": False,
+            "opened": threading.Event(),
+            "stopping": threading.Event(),
             "stopped": False,
         }
 
+        def _audio_cb(in_data, frame_count, time_info, status):
+            # Runs on the PortAudio I/O thread: hand the block off and return.
+            audio_queue.put_nowait(in_data)
+            return (None, pyaudio.paContinue)
+
         class Callback(RecognitionCallback):
             def on_open(self) -> None:
                 print("RecognitionCallback open.")
-                mic = pyaudio.PyAudio()
+                mic = _get_pyaudio()
+                frames_per_buffer = self_outer.config.frames_per_buffer
+                if frames_per_buffer is None:
+                    host_api = self_outer.config.host_api_name
+                    if host_api is None:
+                        try:
+                            host_api = mic.get_default_host_api_info()["name"]
+                        except Exception:
+                            host_api = ""
+                    frames_per_buffer = _default_frames_per_buffer(str(host_api))
                 stream = mic.open(
                     format=pyaudio.paInt16,
                     channels=self_outer.config.channels,
                     rate=self_outer.config.sample_rate,
                     input=True,
+                    frames_per_buffer=frames_per_buffer,
+                    stream_callback=_audio_cb,
                 )
-                state["mic"] = mic
                 state["stream"] = stream
+                state["opened"].set()
 
             def on_close(self) -> None:
                 print("RecognitionCallback close.")
                 stream = state.get("stream")
-                mic = state.get("mic")
                 if stream is not None:
                     try:
                         stream.stop_stream()
@@ -85,13 +194,7 @@ class RealtimeASRClient:
                         stream.close()
                     except Exception:
                         pass
-                if mic is not None:
-                    try:
-                        mic.terminate()
-                    except Exception:
-                        pass
                 state["stream"] = None
-                state["mic"] = None
 
             def on_complete(self) -> None:
                 print("RecognitionCallback completed.")
@@ -102,6 +205,7 @@ class RealtimeASRClient:
                 print("RecognitionCallback task_id: ", request_id)
                 print("RecognitionCallback error: ", msg_text)
                 state["error"] = f"{request_id}: {msg_text}"
+                state["stopping"].set()
 
             def on_event(self, result: RecognitionResult) -> None:
                 sentence = result.get_sentence()
@@ -147,36 +251,110 @@ class RealtimeASRClient:
                 )
             )
 
+        # paInt16 -> 2 bytes per sample per channel.
+        batch_bytes = (
+            max(1, self.config.send_batch_blocks)
+            * self.config.block_size
+            * self.config.channels
+            * 2
+        )
+        max_coalesce_bytes = max(
+            batch_bytes,
+            self.config.sample_rate
+            * self.config.channels
+            * 2
+            * self.config.max_coalesce_ms
+            // 1000,
+        )
+
+        def _send(data: bytes) -> bool:
+            try:
+                recognition.send_audio_frame(data)
+            except Exception as e:
+                # Benign race: Ctrl+C may stop recognition while one more frame is sent.
+                if not (state["stopping"].is_set() and "stopped" in str(e).lower()):
+                    state["error"] = str(e)
+                    state["stopping"].set()
+                return False
+            return True
+
+        def _send_loop() -> None:
+            if self_outer.config.raise_sender_priority:
+                _raise_thread_priority()
+            # Fixed staging buffer reused for every batch. bytes are materialized
+            # once per send because the SDK queues the frame asynchronously.
+            staging = memoryview(bytearray(max_coalesce_bytes))
+            fill = 0
+
+            def _stage(data: bytes) -> bool:
+                nonlocal fill
+                n = len(data)
+                if fill + n > len(staging):
+                    if fill and not _send(bytes(staging[:fill])):
+                        return False
+                    fill = 0
+                    if n > len(staging):
+                        return _send(data)
+                staging[fill : fill + n] = data
+                fill += n
+                return True
+
+            while not state["stopping"].is_set():
+                try:
+                    data = audio_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not _stage(data):
+                    return
+                # Falling behind: drain the backlog and send it as one frame now.
+                drained = audio_queue.qsize() > self_outer.config.drain_threshold
+                if drained:
+                    while fill < max_coalesce_bytes:
+                        try:
+                            data = audio_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if not _stage(data):
+                            return
+                if fill and (drained or fill >= batch_bytes):
+                    if not _send(bytes(staging[:fill])):
+                        return
+                    fill = 0
+            # Flush whatever was captured before Ctrl+C.
+            while True:
+                try:
+                    data = audio_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if not _stage(data):
+                    return
+            if fill and not state["error"]:
+                _send(bytes(staging[:fill]))
+
         previous_handler = signal.getsignal(signal.SIGINT)
 
         def signal_handler(sig, frame):
             # Mark stopping first; main loop/finally will handle stop gracefully.
             print("Ctrl+C pressed, stop recognition ...")
-            state["stopping"] = True
+            # Event.set() takes a lock the interrupted main thread may be holding.
+            threading.Thread(target=state["stopping"].set, daemon=True).start()
 
         signal.signal(signal.SIGINT, signal_handler)
         recognition.start()
+        sender = threading.Thread(target=_send_loop, name="asr-sender", daemon=True)
+        sender.start()
+        state["opened"].wait(timeout=5.0)
         print("Press 'Ctrl+C' to stop recording and recognition...")
 
         try:
-            while not state["stopping"]:
-                stream = state.get("stream")
-                if stream is None:
-                    time.sleep(0.05)
-                    continue
-                data = stream.read(self.config.block_size, exception_on_overflow=False)
-                try:
-                    recognition.send_audio_frame(data)
-                except Exception as e:
-                    # Benign race: Ctrl+C may stop recognition while one more frame is sent.
-                    if state["stopping"] and "stopped" in str(e).lower():
-                        break
-                    raise
-                if state["error"]:
-                    break
+            # A finite timeout keeps Ctrl+C deliverable on Windows.
+            while not state["stopping"].wait(timeout=1.0):
+                pass
         except KeyboardInterrupt:
-            state["stopping"] = True
+            pass
         finally:
+            state["stopping"].set()
+            sender.join(timeout=1.0)
             signal.signal(signal.SIGINT, previous_handler)
             _stop_recognition()
 
@@ -4,11 +4,15 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
 import json
+import operator
+import re
+import sys
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any
 
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 
 from phone_agent.config.i18n import get_message
 
@@ -27,6 +31,97 @@ class ModelConfig:
     lang: str = "cn"
 
 
+class _MarkerMatcher:
+    """Incremental Aho-Corasick matcher used to spot action markers in a stream.
+
+    The matcher state is the trie node for the longest suffix of the text seen
+    so far that is a prefix of some marker, so its depth is also the number of
+    trailing characters that must be held back before printing.
+    """
+
+    def __init__(self, markers: tuple[str, ...]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.depth: list[int] = [0]
+        self.terminal: list[bool] = [False]
+
+        for marker in markers:
+            node = 0
+            for ch in marker:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.depth.append(self.depth[node] + 1)
+                    self.terminal.append(False)
+                node = nxt
+            self.terminal[node] = True
+
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0) if node else 0
+                self.terminal[child] = (
+                    self.terminal[child] or self.terminal[self.fail[child]]
+                )
+                pending.append(child)
+
+    def feed(self, state: int, text: str) -> tuple[int, int]:
+        """Advance over ``text``; return (state, end index of first match or -1)."""
+        goto, fail, terminal = self.goto, self.fail, self.terminal
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if terminal[state]:
+                return state, i + 1
+        return state, -1
+
+
+_ACTION_MARKERS = _MarkerMatcher(("finish(message=", "do(action="))
+
+# Delta attributes used by different providers for streamed reasoning text.
+_REASONING_FIELDS = ("reasoning_content", "reasoning")
+
+
+class _StreamPrinter:
+    """Buffers streamed tokens and flushes stdout on newlines or every interval."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._parts: list[str] = []
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        if "\n" in text or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            sys.stdout.write("".join(self._parts))
+            self._parts.clear()
+        sys.stdout.flush()
+        self._last_flush = time.monotonic()
+
+
+def _build_http_client() -> DefaultHttpxClient:
+    """Create the SDK's default HTTP client, enabling HTTP/2 when h2 is installed."""
+    try:
+        import h2  # noqa: F401
+
+        http2 = True
+    except ImportError:
+        http2 = False
+    return DefaultHttpxClient(http2=http2)
+
+
 @dataclass
 class ModelResponse:
     """Response from the AI model."""
@@ -41,9 +136,15 @@ class ModelResponse:
 class ModelClient:
     """Client for interacting with OpenAI-compatible models."""
 
+    _ACTION_RE = re.compile(r"finish\(message=|do\(action=|<answer>")
+
     def __init__(self, config: ModelConfig | None = None):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+        self.client = OpenAI(
+            base_url=self.config.base_url,
+            api_key=self.config.api_key,
+            http_client=_build_http_client(),
+        )
 
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
         start_time = time.time()
@@ -67,63 +168,84 @@ class ModelClient:
             stream=True,
         )
 
-        raw_content = ""
-        raw_reasoning = ""
-        buffer = ""
-        action_markers = ["finish(message=", "do(action="]
+        raw_content_parts: list[str] = []
+        raw_reasoning_parts: list[str] = []
+        pending = ""
+        match_state = 0
+        feed_markers = _ACTION_MARKERS.feed
+        marker_depth = _ACTION_MARKERS.depth
         in_action_phase = False
+        out = _StreamPrinter()
+        get_reasoning = None
 
-        for chunk in stream:
-            if not chunk.choices:
-                continue
-
-            delta = chunk.choices[0].delta
-
-            # 1. 处理专门的推理字段 (reasoning_content)
-            r_piece = getattr(delta, "reasoning_content", None) or getattr(delta, "reasoning", None)
-            if r_piece:
-                if not first_token_received:
-                    time_to_first_token = time.time() - start_time
-                    first_token_received = True
-                raw_reasoning += str(r_piece)
-                print(str(r_piece), end="", flush=True)
-
-            # 2. 处理普通内容字段 (content)
-            c_piece = getattr(delta, "content", None)
-            if c_piece is not None:
-                if not first_token_received:
-                    time_to_first_token = time.time() - start_time
-                    first_token_received = True
-                
-                raw_content += c_piece
-                if in_action_phase:
+        try:
+            for chunk in stream:
+                choices = chunk.choices
+                if not choices:
                     continue
 
-                buffer += c_piece
-                marker_found = False
-                for marker in action_markers:
-                    if marker in buffer:
-                        thinking_part = buffer.split(marker, 1)[0]
+                delta = choices[0].delta
+
+                # 1. 处理专门的推理字段 (reasoning_content)
+                # 首次出现后绑定该 provider 使用的字段名，避免每个 chunk 重复 getattr 探测
+                if get_reasoning is None:
+                    for name in _REASONING_FIELDS:
+                        r_piece = getattr(delta, name, None)
+                        if r_piece:
+                            get_reasoning = operator.attrgetter(name)
+                            break
+                else:
+                    try:
+                        r_piece = get_reasoning(delta)
+                    except AttributeError:
+                        r_piece = None
+                if r_piece:
+                    if not first_token_received:
+                        time_to_first_token = time.time() - start_time
+                        first_token_received = True
+                    raw_reasoning_parts.append(str(r_piece))
+                    out.write(str(r_piece))
+
+                # 2. 处理普通内容字段 (content)
+                c_piece = delta.content
+                if c_piece is not None:
+                    if not first_token_received:
+                        time_to_first_token = time.time() - start_time
+                        first_token_received = True
+                
+                    raw_content_parts.append(c_piece)
+                    if in_action_phase:
+                        continue
+
+                    text = pending + c_piece
+                    match_state, match_end = feed_markers(match_state, c_piece)
+                    if match_end >= 0:
+                        marker_start = (
+                            len(pending) + match_end - marker_depth[match_state]
+                        )
+                        thinking_part = text[:marker_start]
                         if thinking_part.strip():
-                            print(thinking_part, end="", flush=True)
-                        print()
+                            out.write(thinking_part)
+                        out.write("\n")
                         in_action_phase = True
-                        marker_found = True
                         time_to_thinking_end = time.time() - start_time
-                        break
-                
-                if marker_found:
-                    continue
+                        continue
 
-                # 检查是否可能是 marker 的一部分，防止断字
-                is_p = any(marker.startswith(buffer[-len(marker):]) for marker in action_markers)
-                if not is_p:
-                    print(buffer, end="", flush=True)
-                    buffer = ""
+                    # 保留可能是 marker 前缀的尾部，防止断字
+                    hold = marker_depth[match_state]
+                    emit_len = len(text) - hold
+                    if emit_len > 0:
+                        out.write(text[:emit_len])
+                    pending = text[emit_len:]
 
-        if buffer and not in_action_phase:
-            print(buffer, end="", flush=True)
+            if pending and not in_action_phase:
+                out.write(pending)
+        finally:
+            # Emit buffered tokens even if the stream breaks mid-response.
+            out.flush()
 
+        raw_content = "".join(raw_content_parts)
+        raw_reasoning = "".join(raw_reasoning_parts)
         total_time = time.time() - start_time
         thinking, action = self._parse_response(raw_content)
         
@@ -145,18 +267,15 @@ class ModelClient:
 
     def _parse_response(self, content: str) -> tuple[str, str]:
         """解析内容为 (思考, 动作)"""
-        if "finish(message=" in content:
-            p = content.split("finish(message=", 1)
-            return p[0].strip(), "finish(message=" + p[1]
-        if "do(action=" in content:
-            p = content.split("do(action=", 1)
-            return p[0].strip(), "do(action=" + p[1]
-        if "<answer>" in content:
-            p = content.split("<answer>", 1)
-            t = p[0].replace("<think>", "").replace("</think>", "").strip()
-            a = p[1].replace("</answer>", "").strip()
+        m = self._ACTION_RE.search(content)
+        if m is None:
+            return "", content
+        start = m.start()
+        if m.group() == "<answer>":
+            t = content[:start].replace("<think>", "").replace("</think>", "").strip()
+            a = content[m.end() :].replace("</answer>", "").strip()
             return t, a
-        return "", content
+        return content[:start].strip(), content[start:]
 
 
 class MessageBuilder:
@@ -178,8 +297,9 @@ class MessageBuilder:
 
     @staticmethod
     def remove_images_from_message(msg: dict):
-        if isinstance(msg.get("content"), list):
-            msg["content"] = [i for i in msg["content"] if i.get("type") == "text"]
+        content = msg.get("content")
+        if isinstance(content, list) and any(i.get("type") != "text" for i in content):
+            msg["content"] = [i for i in content if i.get("type") == "text"]
         return msg
 
     @staticmethod